@@ -1,12 +1,42 @@
 import streamlit as st
-import pickle
+import os
 import re
+import sys
 from scipy.sparse import hstack, csr_matrix
 import MeCab
 
-# Load the trained pipeline (scaler + logistic regression)
-with open("logreg_pipeline.pkl", "rb") as f:
-    pipeline = pickle.load(f)
+# Make the model registry from src/ importable
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(APP_DIR, "src"))
+from registry import LiveModel, current_version, load_bundle
+
+# Versioned model registry written by src/train.py
+REGISTRY_DIR = os.path.join(APP_DIR, "streamlit", "models")
+# Directory with the model used until a version is published in the registry
+LEGACY_MODEL_DIR = os.path.join(APP_DIR, "outputs")
+# Seconds between two checks of the registry for a new version
+REGISTRY_POLL_INTERVAL = 30
+
+# POS tags counted as features
+POS_LIST = ['名詞', '動詞', '形容詞', '副詞', '助詞', '助動詞', '連体詞', '感動詞', '接続詞', '接頭詞', '記号']
+# English names used for the POS columns in training (see src/features.py)
+POS_NAMES = {
+    '名詞': 'noun',
+    '動詞': 'verb',
+    '形容詞': 'adjective',
+    '副詞': 'adverb',
+    '助詞': 'particle',
+    '助動詞': 'auxiliary_verb',
+    '連体詞': 'adnominal_adjective',
+    '感動詞': 'interjection',
+    '接続詞': 'conjunction',
+    '接頭詞': 'prefix',
+    '記号': 'symbol',
+}
+# Feature order expected by the legacy model (registry versions ship their own)
+LEGACY_FEATURE_ORDER = ['tokens_nb', 'kanji_count', 'kanji_ratio', 'unique_kanji_count', 'katakana_word_count'] + POS_LIST
+# Text scored once before a new model version goes live
+WARMUP_TEXT = "今日は天気がいいので、友達と公園へ散歩に行きました。"
 
 # === Preprocessing functions ===
 
@@ -52,12 +82,80 @@ def pos_count_from_text(text):
         node = node.next
     return pos_counts
 
+# === Scoring ===
+
+# Compute the numeric features and the joined tokens of a text
+def extract_text_features(user_input):
+    cleaned = clean_text(user_input)
+    only_japanese = keep_japanese(cleaned)
+    tokens = clean_tokens(tokenize_japanese(only_japanese))
+    joined = ' '.join(tokens)
+
+    # Create feature dictionary
+    features = {
+        "tokens_nb": len(tokens),
+        "kanji_count": count_kanji(only_japanese),
+        "kanji_ratio": count_script_ratio(only_japanese),
+        "unique_kanji_count": len(set(re.findall(r'[\u4e00-\u9faf]', only_japanese))),
+        "katakana_word_count": len(re.findall(r'[ァ-ンー]{2,}', only_japanese)),
+    }
+
+    # Count POS tags, stored under both their Japanese and English names
+    pos_counts = pos_count_from_text(only_japanese)
+    for pos in POS_LIST:
+        features[pos] = pos_counts.get(pos, 0)
+        features[POS_NAMES[pos]] = pos_counts.get(pos, 0)
+    return joined, features
+
+# Predict the JLPT level and the probabilities of each level with one model bundle
+def predict_level(bundle, user_input):
+    joined, features = extract_text_features(user_input)
+
+    # Refuse models trained on numeric features this app does not compute
+    unknown = [col for col in bundle.feature_order if col not in features]
+    if unknown:
+        raise ValueError(f"Model {bundle.version} uses features unknown to this app: {unknown}")
+
+    # Transform features, in the feature order of this model
+    X_text = bundle.vectorizer.transform([joined])
+    X_num = csr_matrix([[features[col] for col in bundle.feature_order]])
+    X_final = hstack([X_text, X_num])
+
+    pred = bundle.pipeline.predict(X_final)[0]
+    proba = bundle.pipeline.predict_proba(X_final)[0]
+    return pred, dict(zip(bundle.pipeline.classes_, proba))
+
+# Score a sample text so a new model is fully loaded before serving requests
+def warm_up(bundle):
+    predict_level(bundle, WARMUP_TEXT)
+
+# Shared by all sessions of this process; swaps to new registry versions in the background
+@st.cache_resource
+def load_live_model():
+    live_model = None
+    if current_version(REGISTRY_DIR) is not None:
+        try:
+            live_model = LiveModel(REGISTRY_DIR, warmup=warm_up)
+        except Exception as e:
+            print("Could not load the registry model, using the legacy model:", e)
+
+    # Fall back to the legacy model only when the registry has nothing usable
+    if live_model is None:
+        default = load_bundle(LEGACY_MODEL_DIR, feature_order=LEGACY_FEATURE_ORDER)
+        warm_up(default)
+        live_model = LiveModel(REGISTRY_DIR, warmup=warm_up, default=default)
+    live_model.watch(REGISTRY_POLL_INTERVAL)
+    return live_model
+
 # === Streamlit App UI ===
 
 # Configure Streamlit page
 st.set_page_config(page_title="Japanese Text Difficulty Estimator", layout="centered")
 st.title("Japanese Text Difficulty Estimator")
 
+# Load the current model version (once per process)
+live_model = load_live_model()
+
 # User input box
 user_input = st.text_area("Enter a Japanese text (reading, sentence, etc.)", height=200, key="user_input")
 
@@ -66,50 +164,16 @@ if st.button("Guess the level"):
     if not user_input.strip():
         st.warning("Please enter a Japanese text.")
     else:
-        # Clean and tokenize text
-        cleaned = clean_text(user_input)
-        only_japanese = keep_japanese(cleaned)
-        tokens = clean_tokens(tokenize_japanese(only_japanese))
-        joined = ' '.join(tokens)
-
-        # Create feature dictionary
-        features = {
-            "tokens_nb": len(tokens),
-            "kanji_count": count_kanji(only_japanese),
-            "kanji_ratio": count_script_ratio(only_japanese),
-            "unique_kanji_count": len(set(re.findall(r'[\u4e00-\u9faf]', only_japanese))),
-            "katakana_word_count": len(re.findall(r'[ァ-ンー]{2,}', only_japanese)),
-        }
-
-        # Count POS tags
-        pos_counts = pos_count_from_text(only_japanese)
-        pos_list = ['名詞', '動詞', '形容詞', '副詞', '助詞', '助動詞', '連体詞', '感動詞', '接続詞', '接頭詞', '記号']
-        for pos in pos_list:
-            features[pos] = pos_counts.get(pos, 0)
-
-        # Ensure feature order matches training
-        feature_order = ['tokens_nb', 'kanji_count', 'kanji_ratio', 'unique_kanji_count', 'katakana_word_count'] + pos_list
-
-        # Load the TF-IDF vectorizer
-        with open("vectorizer.pkl", "rb") as f:
-            vectorizer = pickle.load(f)
-
-        # Transform features
-        X_text = vectorizer.transform([joined])
-        X_num = csr_matrix([[features.get(col, 0) for col in feature_order]])
-        X_final = hstack([X_text, X_num])
-
-        # Predict JLPT level and probabilities
-        pred = pipeline.predict(X_final)[0]
-        proba = pipeline.predict_proba(X_final)[0]
+        # Take the current model once, so this request uses a single version
+        # even if a new one is swapped in meanwhile
+        bundle = live_model.get()
+
+        # Clean, tokenize and predict JLPT level and probabilities
+        pred, proba_dict = predict_level(bundle, user_input)
 
         # Display result
         st.success(f"Predicted JLPT Level: **{pred}**")
 
-        # Show probabilities for each class
-        classes = pipeline.classes_
-        proba_dict = dict(zip(classes, proba))
-
         st.subheader("Probabilities for each level:")
         for jlpt_level in sorted(proba_dict.keys()):
             st.write(f"**{jlpt_level}** : {proba_dict[jlpt_level]:.2%}")
@@ -1,3 +1,5 @@
+import os
+
 # PATH to chromedriver folder
 CHROMEDRIVER_PATH = "C:/Users/PC/Downloads/chromedriver-win64/chromedriver.exe"
 
@@ -5,4 +7,7 @@ CHROMEDRIVER_PATH = "C:/Users/PC/Downloads/chromedriver-win64/chromedriver.exe"
 POPPLER_PATH = r"C:\poppler\Library\bin"
 
 # Tesseract path for OCR
-TESSERACT_CMD = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
\ No newline at end of file
+TESSERACT_CMD = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+
+# Model registry where trained versions are published (read by the Streamlit app)
+MODEL_REGISTRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit", "models")
\ No newline at end of file
@@ -7,6 +7,18 @@ from janome.tokenizer import Tokenizer
 # Initialize the Japanese tokenizer from Janome
 tokenizer = Tokenizer()
 
+def clean_token(token):
+    """
+    Clean a single token by stripping whitespace and removing newlines.
+    Returns the cleaned token if it consists of Japanese characters
+    (hiragana, katakana, kanji, and the prolonged sound mark), else None.
+    """
+    token = token.strip().replace('\n', '')
+    # Keep token only if it matches Japanese script characters
+    if token and re.fullmatch(r'[ぁ-んァ-ン一-龯ー]+', token):
+        return token
+    return None
+
 def clean_tokens(token_list):
     """
     Clean the list of tokens by stripping whitespace, removing newlines,
@@ -15,9 +27,8 @@ def clean_tokens(token_list):
     """
     cleaned = []
     for token in token_list:
-        token = token.strip().replace('\n', '')
-        # Keep token only if it matches Japanese script characters
-        if token and re.fullmatch(r'[ぁ-んァ-ン一-龯ー]+', token):
+        token = clean_token(token)
+        if token is not None:
             cleaned.append(token)
     return cleaned
 
@@ -59,9 +70,10 @@ def count_katakana_words(text):
     katakana_words = re.findall(r'[ァ-ンー]{2,}', text)
     return len(katakana_words)
 
-def extract_features(df):
+def extract_features(df, corpus):
     """
-    Given a DataFrame with columns 'text' and 'tokens', extract linguistic features:
+    Given a DataFrame with a 'text' column and the TokenCorpus of its rows,
+    extract linguistic features:
     - Clean tokens
     - Count tokens
     - Count kanji characters
@@ -69,13 +81,14 @@ def extract_features(df):
     - Count parts of speech occurrences
     - Count unique kanji
     - Count katakana words
-    Then remove unwanted columns and return the enriched DataFrame.
+    Then remove unwanted columns and return the enriched DataFrame
+    together with the cleaned TokenCorpus.
     """
-    # Clean tokens in the DataFrame
-    df['tokens'] = df['tokens'].apply(clean_tokens)
+    # Clean tokens once per vocabulary entry instead of once per occurrence
+    corpus = corpus.map_vocab(clean_token)
 
     # Count number of tokens per row
-    df['tokens_nb'] = df['tokens'].apply(len)
+    df['tokens_nb'] = corpus.lengths()
     # Replace missing text with empty string
     df['text'] = df['text'].fillna('')
     # Count kanji characters in text
@@ -112,6 +125,6 @@ def extract_features(df):
     df["katakana_word_count"] = df["text"].apply(count_katakana_words)
 
     # Drop unnecessary columns, ignoring errors if columns do not exist
-    df = df.drop(columns=['filler', 'other', 'url', 'text'], errors='ignore')
+    df = df.drop(columns=['filler', 'other', 'url', 'text', 'text_jp'], errors='ignore')
     
-    return df
+    return df, corpus
@@ -15,13 +15,13 @@ def main():
     # Preprocess the raw data (cleaning, formatting, etc.)
     df = preprocess_data()
     # Apply tokenization on the text data to split it into tokens
-    df = apply_tokenization(df)
+    df, corpus = apply_tokenization(df)
     # Extract linguistic and statistical features from the tokenized data
-    df = extract_features(df)
+    df, corpus = extract_features(df, corpus)
     # Convert text and features into numerical vectors and get target labels
-    X, y = vectorize_text(df)
-    # Train the machine learning model using the feature vectors and labels
-    train_model(X, y)
+    X, y, vectorizer, feature_order = vectorize_text(df, corpus)
+    # Train the machine learning model and publish it to the model registry
+    train_model(X, y, vectorizer, feature_order)
     
 if __name__ == "__main__":
     main()
@@ -0,0 +1,265 @@
+import json
+import os
+import pickle
+import shutil
+import threading
+from datetime import datetime
+
+# File names used inside each model version directory
+PIPELINE_FILE = "logreg_pipeline.pkl"
+VECTORIZER_FILE = "vectorizer.pkl"
+MANIFEST_FILE = "manifest.json"
+# File in the registry root holding the name of the active version
+CURRENT_FILE = "CURRENT"
+
+# Watchers currently polling each registry directory, one per directory
+_watchers = {}
+_watchers_lock = threading.Lock()
+
+class ModelBundle:
+    """
+    Everything needed to score a text with one model version:
+    the trained pipeline, the TF-IDF vectorizer and the order of the
+    numeric feature columns the pipeline was trained on.
+    """
+
+    def __init__(self, version, pipeline, vectorizer, feature_order):
+        self.version = version
+        self.pipeline = pipeline
+        self.vectorizer = vectorizer
+        self.feature_order = feature_order
+
+def _write_atomic(path, data):
+    """
+    Write bytes to 'path' through a temporary file and os.replace,
+    so readers see either the old or the new content, never a partial file.
+    """
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def publish_version(registry_dir, pipeline, vectorizer, feature_order, activate=True):
+    """
+    Save a pipeline, its vectorizer and the feature order manifest as a new
+    version directory of the registry, and make it the current version
+    unless 'activate' is False. Returns the new version name.
+    """
+    os.makedirs(registry_dir, exist_ok=True)
+
+    # Version names are timestamps, with a suffix if one already exists
+    base = datetime.now().strftime("%Y%m%d-%H%M%S")
+    version = base
+    suffix = 1
+    while os.path.exists(os.path.join(registry_dir, version)):
+        version = f"{base}-{suffix}"
+        suffix += 1
+
+    # Write everything in a hidden staging directory, then rename it in one step
+    staging_dir = os.path.join(registry_dir, f".staging-{version}")
+    os.makedirs(staging_dir)
+    try:
+        with open(os.path.join(staging_dir, PIPELINE_FILE), "wb") as f:
+            pickle.dump(pipeline, f)
+        with open(os.path.join(staging_dir, VECTORIZER_FILE), "wb") as f:
+            pickle.dump(vectorizer, f)
+        manifest = {
+            "version": version,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "feature_order": list(feature_order),
+            "n_tfidf_features": len(vectorizer.vocabulary_),
+        }
+        with open(os.path.join(staging_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.rename(staging_dir, os.path.join(registry_dir, version))
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    if activate:
+        activate_version(registry_dir, version)
+    return version
+
+def activate_version(registry_dir, version):
+    """
+    Point the registry's CURRENT file to an existing version.
+    Also used to roll back to a previous version.
+    """
+    version_dir = os.path.join(registry_dir, version)
+    if not os.path.isdir(version_dir):
+        raise ValueError(f"Unknown model version: {version}")
+    for name in (MANIFEST_FILE, PIPELINE_FILE, VECTORIZER_FILE):
+        if not os.path.isfile(os.path.join(version_dir, name)):
+            raise ValueError(f"Model version {version} has no {name}")
+    _write_atomic(os.path.join(registry_dir, CURRENT_FILE), version.encode("utf-8"))
+
+def current_version(registry_dir):
+    """
+    Return the name of the active version, or None if the registry is empty.
+    """
+    try:
+        with open(os.path.join(registry_dir, CURRENT_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def list_versions(registry_dir):
+    """
+    Return the names of all published versions, oldest first.
+    """
+    if not os.path.isdir(registry_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(registry_dir)
+        if not name.startswith(".") and os.path.isdir(os.path.join(registry_dir, name))
+    )
+
+def load_bundle(version_dir, feature_order=None):
+    """
+    Load the pipeline, vectorizer and manifest stored in 'version_dir'.
+    'feature_order' is only used for directories without a manifest
+    (models saved before the registry existed).
+    Raises ValueError if the artifacts do not fit together.
+    """
+    with open(os.path.join(version_dir, PIPELINE_FILE), "rb") as f:
+        pipeline = pickle.load(f)
+    with open(os.path.join(version_dir, VECTORIZER_FILE), "rb") as f:
+        vectorizer = pickle.load(f)
+
+    manifest_path = os.path.join(version_dir, MANIFEST_FILE)
+    version = os.path.basename(os.path.normpath(version_dir))
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        version = manifest["version"]
+        feature_order = manifest["feature_order"]
+    elif feature_order is None:
+        raise ValueError(f"No manifest and no feature order for {version_dir}")
+
+    # The pipeline must expect exactly the TF-IDF columns plus the numeric columns
+    n_features = getattr(pipeline, "n_features_in_", None)
+    expected = len(vectorizer.vocabulary_) + len(feature_order)
+    if n_features is not None and n_features != expected:
+        raise ValueError(
+            f"Model {version} expects {n_features} features, "
+            f"but vectorizer and manifest give {expected}"
+        )
+    return ModelBundle(version, pipeline, vectorizer, list(feature_order))
+
+class LiveModel:
+    """
+    Holds the model bundle used by a running scorer and swaps it for the
+    registry's current version without a restart.
+    A new version is fully loaded and warmed up before the swap, and the
+    swap is a single reference assignment: requests that already called
+    get() keep scoring with the bundle they received.
+    """
+
+    def __init__(self, registry_dir, warmup=None, default=None):
+        self.registry_dir = registry_dir
+        self.warmup = warmup
+        self._bundle = default
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stop = None
+        # Last version whose artifacts were invalid, so it is not reloaded on every poll
+        self._failed_version = None
+        try:
+            self.refresh()
+        except Exception as e:
+            if default is None:
+                raise
+            print("Model refresh failed, using default model:", e)
+
+    def get(self):
+        """
+        Return the bundle to use for one request.
+        Callers should call this once per request and reuse the result.
+        """
+        return self._bundle
+
+    def refresh(self):
+        """
+        Load, warm up and activate the registry's current version if it
+        differs from the one in use. Returns True if a swap happened.
+        If loading or warm-up fails, the bundle in use is kept. Versions
+        with invalid artifacts are skipped until CURRENT changes, while I/O
+        errors (e.g. a missing directory) are retried on the next call.
+        """
+        # Only one thread loads a new version at a time
+        with self._lock:
+            version = current_version(self.registry_dir)
+            if version is None:
+                return False
+            if self._bundle is not None and self._bundle.version == version:
+                return False
+            if version == self._failed_version:
+                return False
+            # A different version is current: give the failed one another chance later
+            self._failed_version = None
+
+            try:
+                bundle = load_bundle(os.path.join(self.registry_dir, version))
+                if self.warmup is not None:
+                    self.warmup(bundle)
+            except OSError:
+                # Possibly temporary (missing files, I/O error): retry on next refresh
+                raise
+            except Exception:
+                # Unpickling, validation or warm-up failure: the version itself is broken
+                self._failed_version = version
+                raise
+
+            # Atomic swap: new requests get the new bundle from now on
+            self._bundle = bundle
+            return True
+
+    def watch(self, interval=30.0):
+        """
+        Start a background thread polling the registry every 'interval'
+        seconds. Calling it again does nothing while the thread is alive.
+        Any other LiveModel watching the same registry directory is stopped,
+        so a discarded instance does not keep polling.
+        """
+        if self._watcher is not None and self._watcher.is_alive() and not self._stop.is_set():
+            return
+
+        # Each thread gets its own event, so stop() only ends the thread it was meant for
+        stop_event = threading.Event()
+
+        def poll():
+            while not stop_event.wait(interval):
+                try:
+                    if self.refresh():
+                        print("Switched to model version:", self._bundle.version)
+                except Exception as e:
+                    # Keep serving the current model if the new one is broken
+                    print("Model refresh failed:", e)
+
+        key = os.path.abspath(self.registry_dir)
+        with _watchers_lock:
+            previous = _watchers.get(key)
+            if previous is not None and previous is not self and previous._stop is not None:
+                previous._stop.set()
+            self._stop = stop_event
+            self._watcher = threading.Thread(target=poll, name="model-registry-watcher", daemon=True)
+            self._watcher.start()
+            _watchers[key] = self
+
+    def stop(self):
+        """
+        Stop the background polling thread, if any.
+        """
+        if self._stop is not None:
+            self._stop.set()
+        with _watchers_lock:
+            key = os.path.abspath(self.registry_dir)
+            if _watchers.get(key) is self:
+                del _watchers[key]
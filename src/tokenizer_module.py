@@ -1,9 +1,67 @@
+from array import array
+
+import numpy as np
 import pandas as pd
 import MeCab
 
 # Initialize MeCab tokenizer in wakati mode (word segmentation)
 tagger = MeCab.Tagger("-Owakati")
 
+class TokenCorpus:
+    """
+    Compact storage for the tokens of every row of a DataFrame.
+    Each distinct token string is stored once in 'vocab', and the rows
+    are stored CSR style: 'ids' is a flat int32 array of vocabulary
+    indices and the tokens of row i are ids[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, vocab, ids, offsets):
+        self.vocab = vocab
+        self.ids = ids
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def lengths(self):
+        """
+        Return the number of tokens of each row as a NumPy array.
+        """
+        return np.diff(self.offsets)
+
+    def row_indices(self):
+        """
+        Return, for each position of 'ids', the index of the row it belongs to.
+        """
+        return np.repeat(np.arange(len(self), dtype=np.int32), self.lengths())
+
+    def map_vocab(self, func):
+        """
+        Apply 'func' to every vocabulary entry once and return a new corpus.
+        'func' returns the cleaned token string, or None to drop the token
+        from every row. Entries that become equal are merged.
+        """
+        new_vocab = []
+        index = {}
+        # Old vocabulary id -> new vocabulary id (-1 for dropped tokens)
+        remap = np.full(len(self.vocab), -1, dtype=np.int32)
+        for old_id, token in enumerate(self.vocab):
+            token = func(token)
+            if token is None:
+                continue
+            if token not in index:
+                index[token] = len(new_vocab)
+                new_vocab.append(token)
+            remap[old_id] = index[token]
+
+        new_ids = remap[self.ids]
+        keep = new_ids >= 0
+        # Recompute row boundaries from the number of kept tokens per row
+        kept_per_row = np.bincount(self.row_indices()[keep], minlength=len(self))
+        new_offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(kept_per_row, out=new_offsets[1:])
+        return TokenCorpus(new_vocab, new_ids[keep], new_offsets)
+
 def tokenize_japanese(text):
     """
     Tokenize a Japanese text string into a list of token surfaces using MeCab.
@@ -13,10 +71,35 @@ def tokenize_japanese(text):
         return []
     return tagger.parse(text).strip().split()
 
+def build_token_corpus(texts):
+    """
+    Tokenize an iterable of texts and intern the tokens into a TokenCorpus.
+    Token lists are consumed one row at a time, so only the vocabulary
+    strings and the flat id array are kept in memory.
+    """
+    vocab = []
+    index = {}
+    ids = array('i')
+    offsets = array('q', [0])
+    for text in texts:
+        for token in tokenize_japanese(text):
+            token_id = index.get(token)
+            if token_id is None:
+                token_id = index[token] = len(vocab)
+                vocab.append(token)
+            ids.append(token_id)
+        offsets.append(len(ids))
+    return TokenCorpus(
+        vocab,
+        np.frombuffer(ids, dtype=np.int32) if len(ids) else np.zeros(0, dtype=np.int32),
+        np.frombuffer(offsets, dtype=np.int64)
+    )
+
 def apply_tokenization(df):
     """
-    Apply Japanese tokenization to the 'text' column of the DataFrame,
-    and store the resulting token lists in a new 'tokens' column.
+    Apply Japanese tokenization to the 'text' column of the DataFrame.
+    Returns the DataFrame and a TokenCorpus holding the tokens of each row
+    (in the DataFrame's row order), instead of a column of Python lists.
     """
-    df['tokens'] = df['text'].apply(tokenize_japanese)
-    return df
\ No newline at end of file
+    corpus = build_token_corpus(df['text'])
+    return df, corpus
@@ -1,14 +1,18 @@
-import pickle
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
 from sklearn.pipeline import Pipeline
 from sklearn.metrics import accuracy_score, classification_report
 
-def train_model(X, y):
+from config import MODEL_REGISTRY_DIR
+from registry import publish_version
+
+def train_model(X, y, vectorizer, feature_order, registry_dir=MODEL_REGISTRY_DIR):
     """
     Train a logistic regression model on the feature matrix X and target y,
-    including data splitting, scaling, training, evaluation, and model saving.
+    including data splitting, scaling, training, evaluation, and publishing
+    the model with its vectorizer and feature order as a new registry version.
+    Returns the new version name.
     """
     # Split data into training and test sets (80% train, 20% test),
     # stratified to keep class balance
@@ -38,6 +42,7 @@ def train_model(X, y):
     print("Accuracy:", accuracy_score(y_test, y_pred))
     print(classification_report(y_test, y_pred))
 
-    # Save the trained pipeline to a file for later use
-    with open("logreg_pipeline.pkl", "wb") as f:
-        pickle.dump(pipeline, f)
+    # Publish the trained pipeline as a new version; running apps switch to it
+    version = publish_version(registry_dir, pipeline, vectorizer, feature_order)
+    print("Published model version:", version)
+    return version
@@ -1,31 +1,71 @@
-import pickle
-from sklearn.feature_extraction.text import TfidfVectorizer
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer, TfidfTransformer
 from scipy.sparse import hstack, csr_matrix
 
-def join_tokens(tokens):
+def build_count_matrix(corpus, max_features=None):
     """
-    Join a list of tokens into a single string separated by spaces,
-    suitable for TF-IDF vectorization.
+    Build the unigram + bigram count matrix of a TokenCorpus directly from
+    its token ids, without joining tokens into strings.
+    Features are ordered and limited like a CountVectorizer with
+    ngram_range=(1, 2): sorted by name, keeping the 'max_features' most
+    frequent ones. Returns the count matrix and the vocabulary dictionary.
     """
-    return ' '.join(tokens)
+    vocab = corpus.vocab
+    vocab_size = len(vocab)
+    rows = corpus.row_indices()
+    ids = corpus.ids.astype(np.int64)
 
-def vectorize_text(df):
+    # Bigrams are pairs of consecutive tokens belonging to the same row,
+    # encoded as a single integer key
+    same_row = rows[:-1] == rows[1:]
+    bigram_rows = rows[:-1][same_row]
+    bigram_keys = ids[:-1][same_row] * vocab_size + ids[1:][same_row]
+    bigram_keys, bigram_ids = np.unique(bigram_keys, return_inverse=True)
+
+    # Unigram columns come first, followed by bigram columns
+    names = list(vocab) + [
+        vocab[key // vocab_size] + ' ' + vocab[key % vocab_size] for key in bigram_keys.tolist()
+    ]
+    cols = np.concatenate([ids, vocab_size + bigram_ids.ravel()])
+    row_idx = np.concatenate([rows, bigram_rows])
+    # Duplicate (row, column) entries are summed into counts
+    counts = csr_matrix(
+        (np.ones(len(cols), dtype=np.int64), (row_idx, cols)),
+        shape=(len(corpus), len(names))
+    )
+
+    # Sort features by name, then keep the most frequent ones
+    order = np.array(sorted(range(len(names)), key=names.__getitem__), dtype=np.int64)
+    if max_features is not None and len(order) > max_features:
+        term_freqs = np.asarray(counts.sum(axis=0)).ravel()[order]
+        top = np.argsort(-term_freqs, kind='stable')[:max_features]
+        order = order[np.sort(top)]
+
+    vocabulary = {names[col]: i for i, col in enumerate(order.tolist())}
+    return counts[:, order], vocabulary
+
+def vectorize_text(df, corpus):
     """
-    Convert tokenized text and numerical features from the DataFrame into
+    Convert the TokenCorpus and numerical features from the DataFrame into
     a combined sparse feature matrix suitable for machine learning.
-    Returns the feature matrix X and target labels y.
+    Returns the feature matrix X, the target labels y, the fitted vectorizer
+    and the order of the numeric feature columns.
     """
-    # Join tokens into strings for TF-IDF
-    df['joined_tokens'] = df['tokens'].apply(join_tokens)
+    # Count unigrams and bigrams directly from the token ids (max 1000 features)
+    counts, vocabulary = build_count_matrix(corpus, max_features=1000)
+
+    # Fit the IDF weights on the counts and transform them into TF-IDF vectors
+    tfidf = TfidfTransformer()
+    X_tfidf = tfidf.fit_transform(counts)
 
-    # Initialize TF-IDF vectorizer with max 1000 features, unigrams and bigrams
+    # Build a TF-IDF vectorizer with the same vocabulary and weights, so that
+    # scoring apps can still transform space-joined token strings
     vectorizer = TfidfVectorizer(
-        max_features=1000,
         ngram_range=(1, 2),
-        token_pattern=r"(?u)\b\w+\b"
+        token_pattern=r"(?u)\b\w+\b",
+        vocabulary=vocabulary
     )
-    # Fit the vectorizer and transform the joined token strings into vectors
-    X_tfidf = vectorizer.fit_transform(df['joined_tokens'])
+    vectorizer.idf_ = tfidf.idf_
 
     # Select numeric columns from the DataFrame (int and float)
     numerical_cols = df.select_dtypes(include=['int', 'float']).columns.tolist()
@@ -35,9 +75,5 @@ def vectorize_text(df):
     # Horizontally stack TF-IDF features and numeric features
     X_final = hstack([X_tfidf, X_numeric])
 
-    # Save the fitted vectorizer for later use
-    with open("vectorizer.pkl", "wb") as f:
-        pickle.dump(vectorizer, f)
-
-    # Return features and target labels
-    return X_final, df['level']  # X, y
+    # Return features, target labels, and what is needed to score new texts
+    return X_final, df['level'], vectorizer, numerical_cols